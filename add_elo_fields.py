@@ -6,32 +6,36 @@ Run this with: python add_elo_fields.py
 from app import create_app
 from app.models import db
 
+ELO_COLUMNS = ['player1_elo_change', 'player2_elo_change']
+
 app = create_app()
 
 with app.app_context():
-    # Add the new columns using raw SQL
+    # Add the new columns using raw SQL, all in one transaction
     try:
-        with db.engine.connect() as conn:
-            # Check if columns already exist
-            result = conn.execute(db.text("PRAGMA table_info(game)"))
-            columns = [row[1] for row in result]
-
-            if 'player1_elo_change' not in columns:
-                conn.execute(db.text("ALTER TABLE game ADD COLUMN player1_elo_change INTEGER DEFAULT 0"))
-                conn.commit()
-                print("Added player1_elo_change column")
+        with db.engine.begin() as conn:
+            if conn.dialect.name == 'postgresql':
+                # One idempotent statement, no need to inspect the table first
+                conn.execute(db.text("ALTER TABLE game " + ", ".join(
+                    f"ADD COLUMN IF NOT EXISTS {column} INTEGER DEFAULT 0" for column in ELO_COLUMNS
+                )))
+                print("ELO change columns added/verified")
             else:
-                print("player1_elo_change column already exists")
+                # Check if columns already exist
+                result = conn.execute(db.text("PRAGMA table_info(game)"))
+                columns = [row[1] for row in result]
 
-            if 'player2_elo_change' not in columns:
-                conn.execute(db.text("ALTER TABLE game ADD COLUMN player2_elo_change INTEGER DEFAULT 0"))
-                conn.commit()
-                print("Added player2_elo_change column")
-            else:
-                print("player2_elo_change column already exists")
+                # pysqlite doesn't open a transaction for DDL by itself
+                conn.exec_driver_sql("BEGIN")
+                for column in ELO_COLUMNS:
+                    if column not in columns:
+                        conn.execute(db.text(f"ALTER TABLE game ADD COLUMN {column} INTEGER DEFAULT 0"))
+                        print(f"Added {column} column")
+                    else:
+                        print(f"{column} column already exists")
 
         print("Migration completed successfully!")
 
     except Exception as e:
         print(f"Error during migration: {e}")
-        print("If you're using a fresh database, you can simply delete the database file and run init_db.py again")
+        print("No changes were applied; fix the error above and run the migration again")
@@ -0,0 +1,29 @@
+"""
+Migration script to add the matchmaking index to Game model
+Run this with: python add_game_indexes.py
+"""
+
+from app import create_app
+from app.models import db, Game
+
+app = create_app()
+
+with app.app_context():
+    try:
+        # The partial index compares status to an integer, so it needs the converted column
+        status = next(col for col in db.inspect(db.engine).get_columns('game') if col['name'] == 'status')
+        if not isinstance(status['type'], db.Integer):
+            print("game.status is not an integer column yet.")
+            print("Run convert_game_enums.py instead, it converts the column and creates the index.")
+            raise SystemExit(1)
+
+        # db.create_all() only creates indexes for new tables, so add them explicitly
+        for index in Game.__table__.indexes:
+            index.create(db.engine, checkfirst=True)
+            print(f"{index.name} index created/verified")
+
+        print("Migration completed successfully!")
+
+    except Exception as e:
+        print(f"Error during migration: {e}")
+        print("If you're using a fresh database, you can simply delete the database file and run init_db.py again")
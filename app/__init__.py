@@ -1,7 +1,12 @@
+from cachetools import TTLCache
 from flask import Flask
-from flask_login import LoginManager
+from flask_caching import Cache
+from flask_limiter import Limiter
+from flask_limiter.util import get_remote_address
+from flask_login import LoginManager, current_user
 from flask_socketio import SocketIO
 import os
+import redis
 
 # Configure SocketIO with options suitable for Railway deployment
 socketio_options = {
@@ -13,6 +18,20 @@ socketio_options = {
 
 socketio = SocketIO(**socketio_options)
 login_manager = LoginManager()
+cache = Cache()
+
+def rate_limit_key():
+    """Rate limit per logged-in user, falling back to the client address"""
+    if current_user.is_authenticated:
+        return str(current_user.id)
+    return get_remote_address()
+
+limiter = Limiter(key_func=rate_limit_key)
+
+# Shared Redis connection for cross-worker state, None when REDIS_URL isn't set
+redis_client = None
+if os.environ.get('REDIS_URL'):
+    redis_client = redis.from_url(os.environ['REDIS_URL'], decode_responses=True)
 
 def create_app():
     """Application factory pattern"""
@@ -28,7 +47,11 @@ def create_app():
     db.init_app(app)
     login_manager.init_app(app)
     login_manager.login_view = 'auth.login'
-    socketio.init_app(app)
+    cache.init_app(app)
+    limiter.init_app(app)
+    # With a message queue, emits are published once to Redis and fanned out
+    # by every worker instead of being serialized per client in this process
+    socketio.init_app(app, message_queue=app.config['REDIS_URL'])
     
     # Register blueprints
     from app.auth import auth_bp
@@ -40,19 +63,43 @@ def create_app():
     # Import socket handlers
     from app import socket_handlers
 
-    # Create tables automatically if they don't exist
-    with app.app_context():
-        try:
-            db.create_all()
-            app.logger.info("Database tables created/verified successfully")
-        except Exception as e:
-            app.logger.error(f"Could not create database tables: {e}")
+    # Deployments with an external database run init_db.py once instead of
+    # reflecting the schema on every cold start. A SQLite file only exists in
+    # the app's own container, so the app still creates its tables there
+    deployed = os.environ.get('VERCEL_ENV') or os.environ.get('RAILWAY_ENVIRONMENT')
+    if not deployed or app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+        with app.app_context():
+            try:
+                db.create_all()
+                app.logger.info("Database tables created/verified successfully")
+            except Exception as e:
+                app.logger.error(f"Could not create database tables: {e}")
 
     return app
 
 
+# Per-process cache of user rows so Flask-Login doesn't query on every request
+user_cache = TTLCache(maxsize=10000, ttl=60)
+
+def invalidate_user(user_id):
+    """Drop a user from the load_user cache after their row changes"""
+    user_cache.pop(str(user_id), None)
+
 @login_manager.user_loader
 def load_user(user_id):
     # Import User here to avoid circular imports
-    from app.models import User
-    return User.query.get(int(user_id))
\ No newline at end of file
+    from app.models import User, db
+    from sqlalchemy.orm import make_transient_to_detached
+
+    columns = user_cache.get(user_id)
+    if columns is None:
+        user = User.query.get(int(user_id))
+        if user is not None:
+            user_cache[user_id] = {column.key: getattr(user, column.key) for column in User.__table__.columns}
+        return user
+
+    # Cache plain column values rather than the instance, which belongs to
+    # another request's session, and attach a copy without querying
+    user = User(**columns)
+    make_transient_to_detached(user)
+    return db.session.merge(user, load=False)
\ No newline at end of file
@@ -1,5 +1,6 @@
 from flask import Blueprint, render_template, redirect, url_for, flash, request
 from flask_login import login_user, logout_user, login_required
+from app import invalidate_user
 from app.models import User, db
 
 auth_bp = Blueprint('auth', __name__)
@@ -43,6 +44,7 @@ def login():
         user = User.query.filter_by(username=username).first()
         
         if user and user.check_password(password):
+            invalidate_user(user.id)
             login_user(user)
             return redirect(url_for('game.lobby'))
         else:
@@ -1,9 +1,15 @@
 from flask import Blueprint, render_template, jsonify, request, redirect, url_for, flash
 from flask_login import login_required, current_user
-from app.models import Game, User, db
+from sqlalchemy.orm import load_only
+from app import cache, limiter
+from app.matchmaking import enqueue_quickplay_game, find_quickplay_game
+from app.models import Game, User, db, win_rate, STATUS_WAITING, STATUS_ACTIVE
 
 game_bp = Blueprint('game', __name__)
 
+# Maximum number of players shown on the leaderboard
+LEADERBOARD_LIMIT = 100
+
 @game_bp.route('/')
 @game_bp.route('/lobby')
 @login_required
@@ -14,28 +20,26 @@ def lobby():
 
     # Only show users who are actually in the lobby (actively connected)
     online_user_ids = get_lobby_users()
-    online_users = User.query.filter(User.id.in_(online_user_ids)).all() if online_user_ids else []
+    # The lobby only renders names, so skip loading the rest of each row
+    online_users = User.query.options(
+        load_only(User.id, User.username, User.elo_rating)
+    ).filter(User.id.in_(online_user_ids)).all() if online_user_ids else []
 
     return render_template('lobby.html', users=online_users)
 
 @game_bp.route('/join-random-game', methods=['POST'])
 @login_required
+@limiter.limit('5/minute')
 def join_random_game():
     """Join or create a random matchmaking game"""
     # First, try to find an existing quickplay game waiting for a player
     # Exclude games where current user is already player1
-    available_game = Game.query.filter_by(
-        status='waiting',
-        is_quickplay=True,
-        player2_id=None
-    ).filter(
-        Game.player1_id != current_user.id
-    ).first()
+    available_game = find_quickplay_game(current_user.id)
 
     if available_game:
         # Join the existing game
         available_game.player2_id = current_user.id
-        available_game.status = 'active'
+        available_game.status = STATUS_ACTIVE
         db.session.commit()
         return jsonify({
             'game_id': available_game.id,
@@ -46,17 +50,26 @@ def join_random_game():
         # No available game, create a new quickplay game
         game = Game(
             player1_id=current_user.id,
-            status='waiting',
+            status=STATUS_WAITING,
             is_quickplay=True
         )
         db.session.add(game)
         db.session.commit()
+        enqueue_quickplay_game(game)
         return jsonify({
             'game_id': game.id,
             'status': 'waiting',
             'message': 'Waiting for an opponent...'
         })
 
+@game_bp.errorhandler(429)
+def rate_limited(e):
+    """Answer rate-limited matchmaking requests with JSON the client can read"""
+    return jsonify({
+        'status': 'rate_limited',
+        'message': 'Too many attempts, please wait a moment'
+    }), 429
+
 @game_bp.route('/game/<int:game_id>')
 @login_required
 def play_game(game_id):
@@ -67,10 +80,10 @@ def play_game(game_id):
     if game.player1_id == current_user.id or game.player2_id == current_user.id:
         # User is already in the game, just show the page
         pass
-    elif game.status == 'waiting' and game.player2_id is None:
+    elif game.status == STATUS_WAITING and game.player2_id is None:
         # Add current user as player2
         game.player2_id = current_user.id
-        game.status = 'active'
+        game.status = STATUS_ACTIVE
         db.session.commit()
     else:
         # Game is full or user is not part of it
@@ -79,22 +92,38 @@ def play_game(game_id):
     
     return render_template('game.html', game=game)
 
+@cache.memoize(timeout=60)
+def get_leaderboard(search_query):
+    """Top players sorted by ELO, cached until ratings change"""
+    # Only the columns the page shows, so the shared cache holds plain dicts
+    # rather than pickled User rows with password hashes and emails
+    query = db.select(
+        User.id, User.username, User.elo_rating, User.games_played,
+        User.games_won, User.games_lost, User.games_tied
+    )
+
+    # Apply search filter if provided
+    if search_query:
+        query = query.where(User.username.ilike(f'%{search_query}%'))
+
+    rows = db.session.execute(
+        query.order_by(User.elo_rating.desc()).limit(LEADERBOARD_LIMIT)
+    ).mappings()
+    return [dict(row, win_rate=win_rate(row['games_won'], row['games_lost'])) for row in rows]
+
+def invalidate_leaderboard():
+    """Drop every cached leaderboard page after ratings change"""
+    cache.delete_memoized(get_leaderboard)
+
 @game_bp.route('/leaderboard')
 def leaderboard():
     """Display ELO leaderboard"""
     # Get search query if provided
     search_query = request.args.get('search', '').strip()
-    
-    # Base query
-    query = User.query
-    
-    # Apply search filter if provided
-    if search_query:
-        query = query.filter(User.username.ilike(f'%{search_query}%'))
-    
+
     # Get top players sorted by ELO
-    players = query.order_by(User.elo_rating.desc()).all()
-    
+    players = get_leaderboard(search_query)
+
     return render_template('leaderboard.html', 
                          players=players, 
                          search_query=search_query)
\ No newline at end of file
@@ -0,0 +1,70 @@
+import time
+
+import redis
+
+from app import redis_client
+from app.models import Game, STATUS_WAITING
+
+# Sorted set of waiting quickplay games, scored by the time they were queued
+QUICKPLAY_QUEUE = 'mm:quickplay'
+
+# How many of the oldest queued games to consider when skipping the user's own
+QUEUE_SCAN_SIZE = 10
+
+def _queue_member(game):
+    return f'{game.id}:{game.player1_id}'
+
+def enqueue_quickplay_game(game):
+    """Make a newly created waiting game available to other players"""
+    if redis_client is not None:
+        redis_client.zadd(QUICKPLAY_QUEUE, {_queue_member(game): time.time()})
+
+def remove_quickplay_game(game):
+    """Take a waiting game out of the queue (e.g. when it is cancelled)"""
+    if redis_client is not None:
+        redis_client.zrem(QUICKPLAY_QUEUE, _queue_member(game))
+
+def _pop_queued_game_id(user_id):
+    """Atomically pop the oldest queued game that user_id didn't create"""
+    own_suffix = f':{user_id}'
+
+    with redis_client.pipeline() as pipe:
+        while True:
+            try:
+                pipe.watch(QUICKPLAY_QUEUE)
+                candidates = pipe.zrange(QUICKPLAY_QUEUE, 0, QUEUE_SCAN_SIZE - 1)
+                member = next((m for m in candidates if not m.endswith(own_suffix)), None)
+
+                if member is None:
+                    pipe.unwatch()
+                    return None
+
+                pipe.multi()
+                pipe.zrem(QUICKPLAY_QUEUE, member)
+                pipe.execute()
+                return int(member.split(':')[0])
+            except redis.WatchError:
+                # Another joiner changed the queue first, try again
+                continue
+
+def find_quickplay_game(user_id):
+    """Find a waiting quickplay game for user_id to join, or None"""
+    if redis_client is None:
+        # Lock the row (skipping ones already claimed) so two joiners can't take the same game
+        return Game.query.filter_by(
+            status=STATUS_WAITING,
+            is_quickplay=True,
+            player2_id=None
+        ).filter(
+            Game.player1_id != user_id
+        ).with_for_update(skip_locked=True).first()
+
+    while True:
+        game_id = _pop_queued_game_id(user_id)
+        if game_id is None:
+            return None
+
+        # The queue can hold games that were cancelled or joined by URL meanwhile
+        game = Game.query.filter_by(id=game_id, status=STATUS_WAITING, player2_id=None).first()
+        if game:
+            return game
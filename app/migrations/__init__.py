@@ -0,0 +1,60 @@
+"""Schema setup and migrations, applied together by run_all()"""
+from contextlib import nullcontext
+
+from flask import Flask
+
+from app.migrations import add_columns, create_tables, email_optional
+from app.migrations.sqlite import bulk_load_pragmas, immediate_transaction, load_schema
+from app.models import db
+
+# Each module's pending(applied) says whether it has work against the loaded
+# schema, and apply(conn, applied) does it and returns the tables it changed
+SQLITE_MIGRATIONS = [
+    create_tables,
+    add_columns,
+    email_optional,
+]
+
+
+def create_db_app():
+    """Bare Flask app with only SQLAlchemy attached, no blueprints or other extensions"""
+    app = Flask(__name__)
+    app.config.from_object('config.Config')
+    db.init_app(app)
+    return app
+
+
+def run_all():
+    """Create missing tables and apply every migration on one connection, in one transaction"""
+    app = create_db_app()
+
+    with app.app_context():
+        if db.engine.dialect.name != 'sqlite':
+            # The column migrations only ever applied to the SQLite development database
+            with db.engine.begin() as conn:
+                create_tables.apply(conn, None)
+            return
+
+        autocommit = db.engine.connect().execution_options(isolation_level='AUTOCOMMIT')
+        with autocommit as conn:
+            # Wait out the live app's locks rather than failing
+            conn.exec_driver_sql("PRAGMA busy_timeout=5000")
+
+            applied = load_schema(conn)
+            todo = [migration for migration in SQLITE_MIGRATIONS if migration.pending(applied)]
+            if not todo:
+                print("Database schema is current, no migrations needed.")
+                return
+
+            # Only the user table rebuild is worth relaxing durability for
+            pragmas = bulk_load_pragmas(conn) if email_optional in todo else nullcontext()
+            with pragmas, immediate_transaction(conn):
+                changed = set()
+                for migration in todo:
+                    changed.update(migration.apply(conn, applied))
+
+                # Refresh planner statistics for rebuilt tables so the app's
+                # first queries don't plan against the old layout
+                for table in sorted(changed):
+                    conn.exec_driver_sql(f'ANALYZE "{table}"')
+                conn.exec_driver_sql("PRAGMA optimize")
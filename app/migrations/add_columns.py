@@ -0,0 +1,30 @@
+"""Add columns introduced after a table was first created"""
+from sqlalchemy.exc import OperationalError
+
+# (table, column, definition) for every column added after a table was first created
+PENDING = [
+    ('game', 'is_quickplay', 'BOOLEAN DEFAULT 0'),
+]
+
+
+def pending(applied):
+    """Whether an existing table lacks a PENDING column; new tables get it from the model"""
+    return any(table in applied and column not in applied[table] for table, column, _ in PENDING)
+
+
+def apply(conn, applied):
+    """Add every PENDING column the database doesn't have yet; returns the altered tables"""
+    altered = set()
+    for table, column, definition in PENDING:
+        # Just try the ALTER (SQLite takes one ADD COLUMN per statement); a
+        # duplicate column fails without aborting the surrounding transaction
+        try:
+            conn.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+        except OperationalError as e:
+            if 'duplicate column name' not in str(e.orig):
+                raise
+            print(f"Column '{column}' already exists on {table}. Migration not needed.")
+        else:
+            altered.add(table)
+            print(f"Successfully added '{column}' column to {table} table!")
+    return altered
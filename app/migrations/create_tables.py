@@ -0,0 +1,42 @@
+"""Create any model tables missing from the database"""
+from sqlalchemy import inspect
+
+from app.migrations.sqlite import load_schema
+from app.models import db
+
+
+def existing_tables(conn):
+    """Names of the tables in the database's default schema"""
+    if conn.dialect.name == 'postgresql':
+        # A single catalog read, without the inspector's reflection queries
+        result = conn.exec_driver_sql(
+            "SELECT tablename FROM pg_tables WHERE schemaname = current_schema()"
+        )
+        return {row[0] for row in result}
+    return set(inspect(conn).get_table_names())
+
+
+def pending(applied):
+    """Whether any model table is missing from the loaded SQLite schema"""
+    return bool(set(db.metadata.tables) - set(applied))
+
+
+def apply(conn, applied):
+    """Create only the missing tables and return them; applied is None outside SQLite"""
+    # One round-trip for the existing tables instead of a probe per model
+    expected = set(db.metadata.tables)
+    existing = set(applied) if applied is not None else existing_tables(conn)
+    missing = expected - existing
+    if not missing:
+        print("Database schema is current, nothing to create.")
+        return missing
+
+    print(f"Creating database tables: {', '.join(sorted(missing))}...")
+    db.metadata.create_all(conn, tables=[db.metadata.tables[name] for name in missing], checkfirst=False)
+    print("Database tables created successfully!")
+
+    if applied is not None:
+        # Later migrations check the new tables' columns too
+        applied.update(load_schema(conn))
+    print(f"\nTables created: {', '.join(sorted(missing))}")
+    return missing
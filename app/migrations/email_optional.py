@@ -0,0 +1,153 @@
+"""Make the user email column optional (nullable, no longer unique) on SQLite"""
+import re
+
+from sqlalchemy.schema import CreateTable
+
+from app.models import User, db
+
+# The NOT NULL on the email column definition in the stored CREATE TABLE
+EMAIL_NOT_NULL = re.compile(r'(\bemail\b[^,]*?)\s+NOT\s+NULL', re.IGNORECASE)
+
+# Fixed statements, built once and handed straight to the driver
+USER_TABLE_SQL = "SELECT sql FROM sqlite_master WHERE type='table' AND name='user'"
+UPDATE_USER_TABLE_SQL = "UPDATE sqlite_master SET sql=? WHERE type='table' AND name='user'"
+COPY_USERS_SQL = "INSERT INTO user_new SELECT * FROM user"
+DROP_USERS_SQL = "DROP TABLE user"
+RENAME_USERS_SQL = "ALTER TABLE user_new RENAME TO user"
+INDEX_USERNAME_SQL = "CREATE UNIQUE INDEX ix_user_username ON user (username)"
+
+
+def user_new_ddl(conn, columns):
+    """CREATE TABLE for user_new from the User model, in the live table's column order"""
+    # SELECT * only lines up if both tables list the same columns in the same order
+    if set(columns) != set(User.__table__.columns.keys()):
+        return live_user_new_ddl(columns)
+
+    # Username's UNIQUE is left off here and indexed after the copy
+    model_columns = User.__table__.columns
+    user_new = db.Table('user_new', db.MetaData(), *(
+        db.Column(name, model_columns[name].type,
+                  primary_key=model_columns[name].primary_key,
+                  nullable=model_columns[name].nullable)
+        for name in columns
+    ))
+    return str(CreateTable(user_new).compile(dialect=conn.dialect))
+
+
+def live_user_new_ddl(columns):
+    """CREATE TABLE for user_new with the live table's exact column order and types"""
+    definitions = []
+    for _, name, col_type, notnull, default, pk in columns.values():
+        definition = f"{name} {col_type}"
+        if notnull and name != 'email':
+            definition += " NOT NULL"
+        if pk:
+            definition += " PRIMARY KEY"
+        if default is not None:
+            definition += f" DEFAULT {default}"
+        definitions.append(definition)
+
+    return "CREATE TABLE user_new (\n    " + ",\n    ".join(definitions) + "\n)"
+
+
+def email_is_unique(conn):
+    """Whether a UNIQUE index/constraint covers the email column"""
+    for index in conn.exec_driver_sql("PRAGMA index_list(user)"):
+        name, unique = index[1], index[2]
+        indexed = [row[2] for row in conn.exec_driver_sql(f"PRAGMA index_info('{name}')")]
+        if unique and indexed == ['email']:
+            return True
+    return False
+
+
+def relax_email_in_schema(conn):
+    """Drop email's NOT NULL by editing the stored schema, without copying rows"""
+    table_sql = conn.exec_driver_sql(USER_TABLE_SQL).scalar()
+    new_sql, replaced = EMAIL_NOT_NULL.subn(r'\1', table_sql, count=1)
+    if not replaced:
+        return False
+
+    # Relaxing NOT NULL is one of the schema edits SQLite documents as safe
+    # under writable_schema; bumping schema_version makes it re-parse the table
+    schema_version = conn.exec_driver_sql("PRAGMA schema_version").scalar()
+    conn.exec_driver_sql("PRAGMA writable_schema=ON")
+    try:
+        conn.exec_driver_sql(UPDATE_USER_TABLE_SQL, (new_sql,))
+        conn.exec_driver_sql(f"PRAGMA schema_version={schema_version + 1}")
+    finally:
+        conn.exec_driver_sql("PRAGMA writable_schema=OFF")
+
+    return conn.exec_driver_sql("PRAGMA integrity_check").scalar() == 'ok'
+
+
+def rebuild_user_table(conn, columns):
+    """Recreate the user table without email's NOT NULL and UNIQUE"""
+    statements = [
+        # Step 1: Create new table with updated schema
+        user_new_ddl(conn, columns),
+        # Step 2: Copy data from old table to new table. With identical
+        # column layouts SQLite can copy raw b-tree pages (xfer optimization).
+        # Kept as one statement: id-range batches would lose that, and savepoints
+        # can't shrink the journal of the transaction they sit in. The new
+        # table's pages are appended past the old end of file, so they aren't
+        # journaled anyway
+        COPY_USERS_SQL,
+        # Step 3: Drop old table
+        DROP_USERS_SQL,
+        # Step 4: Rename new table to original name
+        RENAME_USERS_SQL,
+        # Step 5: Build the username index in one sorted pass over the
+        # copied rows instead of maintaining it row by row during the copy
+        INDEX_USERNAME_SQL,
+    ]
+
+    # Straight on the sqlite3 cursor; executescript() would COMMIT the
+    # surrounding transaction before running
+    cursor = conn.connection.cursor()
+    try:
+        # Game rows reference user; only check foreign keys at commit
+        cursor.execute("PRAGMA defer_foreign_keys=ON")
+        for statement in statements:
+            cursor.execute(statement)
+    finally:
+        cursor.close()
+
+
+def pending(applied):
+    """Whether an existing user table still has email NOT NULL"""
+    return 'user' in applied and applied['user']['email'][3] != 0
+
+
+def apply(conn, applied):
+    """Make the user email column nullable; runs inside the caller's transaction"""
+    columns = applied['user']
+    if columns['email'][3] == 0:
+        print("Email is already optional. Migration not needed.")
+        return ()
+
+    print("Current user table schema:\n" + "\n".join(
+        f"  {col_name}: nullable={col_info[3] == 0}" for col_name, col_info in columns.items()
+    ))
+
+    print("\nMaking email field optional...")
+
+    # A UNIQUE constraint's index can't be dropped, only rebuilt away
+    rebuilt = True
+    if not email_is_unique(conn):
+        conn.exec_driver_sql("SAVEPOINT relax_email")
+        if relax_email_in_schema(conn):
+            rebuilt = False
+        else:
+            conn.exec_driver_sql("ROLLBACK TO relax_email")
+        conn.exec_driver_sql("RELEASE relax_email")
+
+    if rebuilt:
+        # SQLite doesn't support ALTER COLUMN, so we need to recreate the table
+        rebuild_user_table(conn, columns)
+
+    print("✓ Email field is now optional (nullable)")
+    if rebuilt:
+        print("✓ Email unique constraint removed")
+    else:
+        print("✓ Updated in place, no rows copied")
+    return ('user',)
@@ -0,0 +1,52 @@
+"""SQLite connection helpers shared by the migrations"""
+from contextlib import contextmanager
+
+
+@contextmanager
+def immediate_transaction(conn):
+    """BEGIN IMMEDIATE ... COMMIT on an autocommit connection, ROLLBACK on error"""
+    # pysqlite's own transaction handling is off (isolation_level None), so
+    # the write lock is taken up front and nothing is begun implicitly
+    conn.exec_driver_sql("BEGIN IMMEDIATE")
+    try:
+        yield
+    except BaseException:
+        conn.exec_driver_sql("ROLLBACK")
+        raise
+    conn.exec_driver_sql("COMMIT")
+
+
+@contextmanager
+def bulk_load_pragmas(conn):
+    """Relax durability around a table rebuild, restoring the connection afterwards"""
+    # Only the final commit needs to hit disk, so skip per-statement syncs
+    journal_mode = conn.exec_driver_sql("PRAGMA journal_mode").scalar()
+    synchronous = conn.exec_driver_sql("PRAGMA synchronous").scalar()
+    conn.exec_driver_sql("PRAGMA synchronous=OFF")
+    if journal_mode != 'wal':
+        # Keep the rollback journal in memory. A WAL database keeps its journal:
+        # leaving WAL needs every other connection to the file closed
+        conn.exec_driver_sql("PRAGMA journal_mode=MEMORY")
+        conn.exec_driver_sql("PRAGMA locking_mode=EXCLUSIVE")
+    conn.exec_driver_sql("PRAGMA temp_store=MEMORY")
+    conn.exec_driver_sql("PRAGMA cache_size=-200000")
+    try:
+        yield
+    finally:
+        conn.exec_driver_sql(f"PRAGMA synchronous={synchronous}")
+        if journal_mode != 'wal':
+            conn.exec_driver_sql("PRAGMA locking_mode=NORMAL")
+            conn.exec_driver_sql(f"PRAGMA journal_mode={journal_mode}")
+
+
+def load_schema(conn):
+    """Every table's column info in one query: {table: {column: table_info row}}"""
+    result = conn.exec_driver_sql(
+        "SELECT m.name, p.cid, p.name, p.type, p.\"notnull\", p.dflt_value, p.pk "
+        "FROM sqlite_master m JOIN pragma_table_info(m.name) p "
+        "WHERE m.type = 'table'"
+    )
+    applied = {}
+    for table, *column in result:
+        applied.setdefault(table, {})[column[1]] = tuple(column)
+    return applied
@@ -5,6 +5,28 @@ from datetime import datetime
 
 db = SQLAlchemy()
 
+# Game.status values
+STATUS_WAITING = 0
+STATUS_ACTIVE = 1
+STATUS_COMPLETED = 2
+STATUS_CANCELLED = 3
+
+# Game.player1_choice / player2_choice values, ordered so each choice beats the one before it
+CHOICE_ROCK = 0
+CHOICE_PAPER = 1
+CHOICE_SCISSORS = 2
+CHOICE_TIMEOUT = 3
+
+# Names the client uses for each choice value
+CHOICE_NAMES = ('rock', 'paper', 'scissors', 'timeout')
+
+def win_rate(games_won, games_lost):
+    """Win rate percentage over decided (non-tied) games"""
+    total_decided_games = games_won + games_lost
+    if total_decided_games == 0:
+        return 0.0
+    return round((games_won / total_decided_games) * 100, 1)
+
 class User(UserMixin, db.Model):
     """User model for authentication"""
     id = db.Column(db.Integer, primary_key=True)
@@ -31,21 +53,27 @@ class User(UserMixin, db.Model):
     @property
     def win_rate(self):
         """Calculate win rate percentage"""
-        total_decided_games = self.games_won + self.games_lost
-        if total_decided_games == 0:
-            return 0.0
-        return round((self.games_won / total_decided_games) * 100, 1)
+        return win_rate(self.games_won, self.games_lost)
 
 
 class Game(db.Model):
     """Game model to track matches"""
+    __table_args__ = (
+        # Partial index covering only the open quickplay games matchmaking looks for
+        db.Index(
+            'ix_game_waiting_quickplay', 'status', 'is_quickplay', 'player2_id',
+            postgresql_where=db.text(f"status = {STATUS_WAITING} AND is_quickplay = true AND player2_id IS NULL"),
+            sqlite_where=db.text(f"status = {STATUS_WAITING} AND is_quickplay = 1 AND player2_id IS NULL")
+        ),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     player1_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     player2_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
-    player1_choice = db.Column(db.String(10))  # rock, paper, scissors
-    player2_choice = db.Column(db.String(10))
+    player1_choice = db.Column(db.SmallInteger)  # CHOICE_* value, None until chosen
+    player2_choice = db.Column(db.SmallInteger)
     winner_id = db.Column(db.Integer, db.ForeignKey('user.id'))
-    status = db.Column(db.String(20), default='waiting')  # waiting, active, completed, cancelled
+    status = db.Column(db.SmallInteger, default=STATUS_WAITING)  # STATUS_* value
     is_quickplay = db.Column(db.Boolean, default=False)  # True if random matchmaking game
     player1_elo_change = db.Column(db.Integer, default=0)  # ELO change for player1
     player2_elo_change = db.Column(db.Integer, default=0)  # ELO change for player2
@@ -1,83 +1,272 @@
 from flask_socketio import emit, join_room, leave_room, disconnect
 from flask_login import current_user
-from flask import flash, request
-from app import socketio
-from app.models import Game, db, User
+from flask import flash, request, current_app, g, has_app_context
+from app import socketio, redis_client, invalidate_user, limiter
+from app.game import invalidate_leaderboard
+from app.matchmaking import remove_quickplay_game
+from app.models import (
+    Game, db, User,
+    STATUS_WAITING, STATUS_ACTIVE, STATUS_COMPLETED, STATUS_CANCELLED,
+    CHOICE_ROCK, CHOICE_PAPER, CHOICE_SCISSORS, CHOICE_TIMEOUT, CHOICE_NAMES
+)
+from limits import parse
+from sqlalchemy import event
+from sqlalchemy.orm import joinedload
 from datetime import datetime
-import threading
+import eventlet
+import redis
+import time
 
-# Track active users and their current rooms
+# Track active users and their current rooms (used when Redis isn't configured)
 active_users = {}  # {session_id: {'user_id': id, 'room': 'lobby' or 'game_X'}}
 
-# Track game timers
-game_timers = {}  # {game_id: {'player1_timer': Timer, 'player2_timer': Timer}}
+# Track game timers started by this worker
+game_timers = {}  # {game_id: {'player1_timer': GreenThread, 'player2_timer': GreenThread}}
+
+# Redis keys for state shared between workers
+SESSION_KEY = 'rps:session:{session_id}'  # hash: user_id, room
+LOBBY_KEY = 'rps:lobby'  # hash: session_id -> user_id
+TIMER_KEY = 'rps:timer:{game_id}'  # hash: player_id -> deadline timestamp
+
+# Session keys expire unless the worker holding the socket keeps refreshing
+# them, so sessions left behind by a dead worker drop out of the lobby
+SESSION_TTL_SECONDS = 90
+SESSION_REFRESH_SECONDS = 30
+
+# Sessions connected to this worker, and the greenlet refreshing their TTLs
+local_sessions = set()
+session_refresher = None
 
 # Turn timer duration in seconds
 TURN_TIMER_SECONDS = 30
 
+# Most choices a single user may submit per minute
+CHOICE_RATE_LIMIT = parse('30/minute')
+
+# Choices a player can submit, by the name the client sends
+PLAYABLE_CHOICES = {'rock': CHOICE_ROCK, 'paper': CHOICE_PAPER, 'scissors': CHOICE_SCISSORS}
+
+# Expected ELO score for every rating difference we distinguish; beyond
+# +/-1000 the expected score is within 0.003 of 0 or 1 anyway
+MAX_RATING_DIFF = 1000
+EXPECTED_SCORES = [1.0 / (1.0 + 10.0 ** (diff / 400.0)) for diff in range(-MAX_RATING_DIFF, MAX_RATING_DIFF + 1)]
+
+def refresh_local_sessions():
+    """Periodically extend the TTL of every session connected to this worker"""
+    while True:
+        eventlet.sleep(SESSION_REFRESH_SECONDS)
+        if not local_sessions:
+            continue
+        try:
+            with redis_client.pipeline(transaction=False) as pipe:
+                for session_id in list(local_sessions):
+                    pipe.expire(SESSION_KEY.format(session_id=session_id), SESSION_TTL_SECONDS)
+                pipe.execute()
+        except redis.RedisError as e:
+            print(f"Failed to refresh session TTLs: {e}")
+
+def track_session(session_id, user_id):
+    """Start tracking a connected session"""
+    global session_refresher
+
+    if redis_client is None:
+        active_users[session_id] = {
+            'user_id': user_id,
+            'room': None
+        }
+        return
+
+    key = SESSION_KEY.format(session_id=session_id)
+    with redis_client.pipeline() as pipe:
+        pipe.hset(key, 'user_id', user_id)
+        pipe.expire(key, SESSION_TTL_SECONDS)
+        pipe.execute()
+
+    local_sessions.add(session_id)
+    if session_refresher is None:
+        session_refresher = socketio.start_background_task(refresh_local_sessions)
+
+def set_session_room(session_id, room):
+    """Record which room a tracked session is currently in"""
+    if redis_client is None:
+        if session_id in active_users:
+            active_users[session_id]['room'] = room
+        return
+
+    key = SESSION_KEY.format(session_id=session_id)
+    user_id = redis_client.hget(key, 'user_id')
+    if user_id is None:
+        return
+
+    with redis_client.pipeline() as pipe:
+        pipe.hset(key, 'room', room or '')
+        pipe.expire(key, SESSION_TTL_SECONDS)
+        if room == 'lobby':
+            pipe.hset(LOBBY_KEY, session_id, user_id)
+        else:
+            pipe.hdel(LOBBY_KEY, session_id)
+        pipe.execute()
+
+def pop_session(session_id):
+    """Stop tracking a session and return its user_id/room, or None if untracked"""
+    if redis_client is None:
+        return active_users.pop(session_id, None)
+
+    local_sessions.discard(session_id)
+    key = SESSION_KEY.format(session_id=session_id)
+    with redis_client.pipeline() as pipe:
+        pipe.hgetall(key)
+        pipe.delete(key)
+        pipe.hdel(LOBBY_KEY, session_id)
+        user_info = pipe.execute()[0]
+
+    if not user_info:
+        return None
+    return {
+        'user_id': int(user_info['user_id']),
+        'room': user_info.get('room') or None
+    }
+
 def get_lobby_users():
     """Get list of user IDs currently in the lobby"""
-    lobby_user_ids = set()
-    for user_info in active_users.values():
-        if user_info.get('room') == 'lobby':
-            lobby_user_ids.add(user_info['user_id'])
-    return list(lobby_user_ids)
+    if redis_client is None:
+        lobby_user_ids = set()
+        for user_info in active_users.values():
+            if user_info.get('room') == 'lobby':
+                lobby_user_ids.add(user_info['user_id'])
+        return list(lobby_user_ids)
+
+    lobby = redis_client.hgetall(LOBBY_KEY)
+    if not lobby:
+        return []
+
+    # Drop sessions whose worker stopped refreshing them without a clean
+    # disconnect (e.g. the worker died)
+    with redis_client.pipeline() as pipe:
+        for session_id in lobby:
+            pipe.exists(SESSION_KEY.format(session_id=session_id))
+        alive = pipe.execute()
+    stale = [session_id for session_id, exists in zip(lobby, alive) if not exists]
+    if stale:
+        redis_client.hdel(LOBBY_KEY, *stale)
+
+    return list({int(user_id) for session_id, user_id in lobby.items() if session_id not in stale})
+
+def get_game_with_players(game_id):
+    """Load a game together with both players in a single query"""
+    # populate_existing so a current_user restored from the load_user cache
+    # is refreshed with the row's latest values
+    return Game.query.options(
+        joinedload(Game.player1),
+        joinedload(Game.player2)
+    ).populate_existing().get(game_id)
+
+def emit_after_commit(event_name, payload, room):
+    """Queue a broadcast that only goes out once the current transaction commits"""
+    g.setdefault('pending_emits', []).append((event_name, payload, room))
+
+def send_emits(pending):
+    for event_name, payload, room in pending:
+        socketio.emit(event_name, payload, room=room)
+
+@event.listens_for(db.session, 'after_commit')
+def flush_pending_emits(session):
+    """Broadcast queued events now that the state they describe is durable"""
+    if not has_app_context():
+        return
+
+    pending = g.pop('pending_emits', None)
+    if pending:
+        # Run the fan-out as its own greenlet so it never holds the DB connection
+        socketio.start_background_task(send_emits, pending)
+
+@event.listens_for(db.session, 'after_rollback')
+def discard_pending_emits(session):
+    """Never announce changes that were rolled back"""
+    if has_app_context():
+        g.pop('pending_emits', None)
 
 def handle_timer_expire(game_id, player_id):
     """Handle when a player's turn timer expires"""
-    game = Game.query.get(game_id)
+    game = get_game_with_players(game_id)
 
-    if not game or game.status != 'active':
+    if not game or game.status != STATUS_ACTIVE:
         return
 
     # Check if player already made a choice
-    if player_id == game.player1_id and game.player1_choice:
+    if player_id == game.player1_id and game.player1_choice is not None:
         return
-    if player_id == game.player2_id and game.player2_choice:
+    if player_id == game.player2_id and game.player2_choice is not None:
         return
 
     # Player didn't make a choice in time - they lose
     # Determine winner (the other player)
     if player_id == game.player1_id:
-        winner_id = game.player2_id
-        loser_id = game.player1_id
+        winner, loser = game.player2, game.player1
         # Set a default losing choice for the player who timed out
-        game.player1_choice = 'timeout'
+        game.player1_choice = CHOICE_TIMEOUT
         # If opponent hasn't chosen yet, set a default winning choice
-        if not game.player2_choice:
-            game.player2_choice = 'rock'
+        if game.player2_choice is None:
+            game.player2_choice = CHOICE_ROCK
     else:
-        winner_id = game.player1_id
-        loser_id = game.player2_id
-        game.player2_choice = 'timeout'
-        if not game.player1_choice:
-            game.player1_choice = 'rock'
-
-    game.winner_id = winner_id
-    game.status = 'completed'
+        winner, loser = game.player1, game.player2
+        game.player2_choice = CHOICE_TIMEOUT
+        if game.player1_choice is None:
+            game.player1_choice = CHOICE_ROCK
+
+    game.winner_id = winner.id
+    game.status = STATUS_COMPLETED
     game.completed_at = datetime.utcnow()
 
     # Update ELO ratings
-    update_elo_ratings(game)
+    update_elo_ratings(game, game.player1, game.player2)
+
+    # Build the payload before the commit expires the loaded players
+    payload = {
+        'winner_id': winner.id,
+        'loser_id': loser.id,
+        'winner_username': winner.username,
+        'loser_username': loser.username,
+        'player1_elo_change': game.player1_elo_change,
+        'player2_elo_change': game.player2_elo_change
+    }
 
+    # Notify both players once the result is committed
+    emit_after_commit('game_timeout', payload, f'game_{game_id}')
+    player_ids = (game.player1_id, game.player2_id)
+
+    # Release the connection before fanning out to the room
     db.session.commit()
+    db.session.close()
+
+    # Drop cached ratings only once the new ones are committed
+    for user_id in player_ids:
+        invalidate_user(user_id)
+    invalidate_leaderboard()
 
     # Cancel any remaining timers for this game
     cancel_game_timers(game_id)
 
-    # Get player usernames
-    winner = User.query.get(winner_id)
-    loser = User.query.get(loser_id)
+def claim_expired_timer(game_id, player_id):
+    """Check a timer is still due, making sure only one worker handles it"""
+    if redis_client is None:
+        return True
 
-    # Notify both players
-    socketio.emit('game_timeout', {
-        'winner_id': winner_id,
-        'loser_id': loser_id,
-        'winner_username': winner.username if winner else 'Unknown',
-        'loser_username': loser.username if loser else 'Unknown',
-        'player1_elo_change': game.player1_elo_change,
-        'player2_elo_change': game.player2_elo_change
-    }, room=f'game_{game_id}')
+    key = TIMER_KEY.format(game_id=game_id)
+    deadline = redis_client.hget(key, player_id)
+
+    # Missing means another worker cancelled it, a later deadline means it was restarted
+    if deadline is None or float(deadline) > time.time() + 1:
+        return False
+    return redis_client.hdel(key, player_id) == 1
+
+def run_timer_expire(app, game_id, player_id):
+    """Timers fire outside any request, so give the handler its own app context"""
+    if not claim_expired_timer(game_id, player_id):
+        return
+
+    with app.app_context():
+        handle_timer_expire(game_id, player_id)
 
 def start_turn_timer(game_id, player_id):
     """Start a timer for a player's turn"""
@@ -90,13 +279,26 @@ def start_turn_timer(game_id, player_id):
     if timer_key in game_timers[game_id]:
         game_timers[game_id][timer_key].cancel()
 
-    # Create new timer
-    timer = threading.Timer(TURN_TIMER_SECONDS, handle_timer_expire, args=[game_id, player_id])
-    timer.start()
+    # Publish the deadline so any worker can cancel it
+    if redis_client is not None:
+        key = TIMER_KEY.format(game_id=game_id)
+        with redis_client.pipeline() as pipe:
+            pipe.hset(key, player_id, time.time() + TURN_TIMER_SECONDS)
+            pipe.expire(key, TURN_TIMER_SECONDS * 2)
+            pipe.execute()
+
+    # Schedule the expiry as a greenlet on the eventlet hub rather than an OS thread
+    timer = eventlet.spawn_after(
+        TURN_TIMER_SECONDS, run_timer_expire,
+        current_app._get_current_object(), game_id, player_id
+    )
     game_timers[game_id][timer_key] = timer
 
 def cancel_player_timer(game_id, player_id):
     """Cancel a specific player's timer"""
+    if redis_client is not None:
+        redis_client.hdel(TIMER_KEY.format(game_id=game_id), player_id)
+
     if game_id not in game_timers:
         return
 
@@ -107,6 +309,9 @@ def cancel_player_timer(game_id, player_id):
 
 def cancel_game_timers(game_id):
     """Cancel all timers for a game"""
+    if redis_client is not None:
+        redis_client.delete(TIMER_KEY.format(game_id=game_id))
+
     if game_id in game_timers:
         for timer in game_timers[game_id].values():
             timer.cancel()
@@ -116,7 +321,7 @@ def cancel_game_timers(game_id):
 def handle_join_game(data):
     """Player joins a game room"""
     game_id = data['game_id']
-    game = Game.query.get(game_id)
+    game = get_game_with_players(game_id)
 
     if not game:
         return
@@ -126,23 +331,21 @@ def handle_join_game(data):
     join_room(room_name)
 
     # Track user's current room
-    session_id = request.sid
-    if session_id in active_users:
-        active_users[session_id]['room'] = room_name
+    set_session_room(request.sid, room_name)
 
     # Check current game state and notify accordingly
-    if game.status == 'active' and game.player2_id is not None:
+    if game.status == STATUS_ACTIVE and game.player2_id is not None:
         # Game is already active with both players
         # Determine opponent username
         if current_user.id == game.player1_id:
-            opponent = User.query.get(game.player2_id)
+            opponent = game.player2
         else:
-            opponent = User.query.get(game.player1_id)
+            opponent = game.player1
 
         # Start timers for both players if they haven't made choices
-        if not game.player1_choice:
+        if game.player1_choice is None:
             start_turn_timer(game_id, game.player1_id)
-        if not game.player2_choice:
+        if game.player2_choice is None:
             start_turn_timer(game_id, game.player2_id)
 
         # Notify all players in the room
@@ -163,9 +366,16 @@ def handle_join_game(data):
 def handle_choice(data):
     """Handle player's rock/paper/scissors choice"""
     game_id = data['game_id']
-    choice = data['choice']  # 'rock', 'paper', or 'scissors'
+    choice = PLAYABLE_CHOICES.get(data['choice'])  # 'rock', 'paper', or 'scissors'
+
+    if choice is None:
+        return
+
+    # Shed floods cheaply before touching the database
+    if not limiter.limiter.hit(CHOICE_RATE_LIMIT, 'make_choice', str(current_user.id)):
+        return
 
-    game = Game.query.get(game_id)
+    game = get_game_with_players(game_id)
 
     if current_user.id == game.player1_id:
         game.player1_choice = choice
@@ -177,106 +387,120 @@ def handle_choice(data):
         cancel_player_timer(game_id, game.player2_id)
 
     # Check if both players have made choices
-    if game.player1_choice and game.player2_choice:
+    if game.player1_choice is not None and game.player2_choice is not None:
         winner_id = determine_winner(game)
         game.winner_id = winner_id
-        game.status = 'completed'
+        game.status = STATUS_COMPLETED
         game.completed_at = datetime.utcnow()
 
         # Update ELO ratings
-        update_elo_ratings(game)
+        update_elo_ratings(game, game.player1, game.player2)
+
+        payload = {
+            'player1_choice': CHOICE_NAMES[game.player1_choice],
+            'player2_choice': CHOICE_NAMES[game.player2_choice],
+            'winner_id': winner_id,
+            'player1_elo_change': game.player1_elo_change,
+            'player2_elo_change': game.player2_elo_change
+        }
 
+        # Broadcast result to both players once it is committed
+        emit_after_commit('game_result', payload, f'game_{game_id}')
+        player_ids = (game.player1_id, game.player2_id)
+
+        # Release the connection before fanning out to the room
         db.session.commit()
+        db.session.close()
+
+        # Drop cached ratings only once the new ones are committed
+        for user_id in player_ids:
+            invalidate_user(user_id)
+        invalidate_leaderboard()
 
         # Cancel all timers for this game
         cancel_game_timers(game_id)
-
-        # Broadcast result to both players
-        emit('game_result', {
-            'player1_choice': game.player1_choice,
-            'player2_choice': game.player2_choice,
-            'winner_id': winner_id,
-            'player1_elo_change': game.player1_elo_change,
-            'player2_elo_change': game.player2_elo_change
-        }, room=f'game_{game_id}')
     else:
+        player_id = current_user.id
         db.session.commit()
+        db.session.close()
         emit('choice_made', {
-            'player_id': current_user.id
+            'player_id': player_id
         }, room=f'game_{game_id}')
 
 def determine_winner(game):
     """Determine the winner based on choices"""
     p1_choice = game.player1_choice
     p2_choice = game.player2_choice
-    
+
     if p1_choice == p2_choice:
         return None  # Tie
-    
-    winning_combinations = {
-        ('rock', 'scissors'): game.player1_id,
-        ('paper', 'rock'): game.player1_id,
-        ('scissors', 'paper'): game.player1_id,
-        ('scissors', 'rock'): game.player2_id,
-        ('rock', 'paper'): game.player2_id,
-        ('paper', 'scissors'): game.player2_id
-    }
-    
-    return winning_combinations.get((p1_choice, p2_choice))
 
-def update_elo_ratings(game):
-    """Update ELO ratings for both players based on game outcome"""
-    player1 = User.query.get(game.player1_id)
-    player2 = User.query.get(game.player2_id)
+    # A timed-out player always loses
+    if p1_choice == CHOICE_TIMEOUT:
+        return game.player2_id
+    if p2_choice == CHOICE_TIMEOUT:
+        return game.player1_id
+
+    # Choices form a cycle where each one beats its predecessor
+    if (p1_choice - p2_choice) % 3 == 1:
+        return game.player1_id
+    return game.player2_id
 
+def update_elo_ratings(game, player1, player2):
+    """Update ELO ratings for both players based on game outcome"""
     # K-factor: maximum rating change per game
     K = 10
 
-    # Expected scores based on current ratings
-    expected_p1 = 1 / (1 + 10 ** ((player2.elo_rating - player1.elo_rating) / 400))
-    expected_p2 = 1 / (1 + 10 ** ((player1.elo_rating - player2.elo_rating) / 400))
+    # Expected scores based on current ratings, looked up by rating difference
+    rating_diff = max(-MAX_RATING_DIFF, min(MAX_RATING_DIFF, player2.elo_rating - player1.elo_rating))
+    expected_p1 = EXPECTED_SCORES[rating_diff + MAX_RATING_DIFF]
+    expected_p2 = 1.0 - expected_p1
 
-    # Actual scores (1 = win, 0.5 = tie, 0 = loss)
+    # Actual scores (1 = win, 0.5 = tie, 0 = loss) and per-player stat increments
     if game.winner_id is None:  # Tie
         score_p1 = 0.5
         score_p2 = 0.5
-        player1.games_tied += 1
-        player2.games_tied += 1
+        won, lost, tied = (0, 0), (0, 0), (1, 1)
     elif game.winner_id == game.player1_id:  # Player 1 wins
         score_p1 = 1.0
         score_p2 = 0.0
-        player1.games_won += 1
-        player2.games_lost += 1
+        won, lost, tied = (1, 0), (0, 1), (0, 0)
     else:  # Player 2 wins
         score_p1 = 0.0
         score_p2 = 1.0
-        player1.games_lost += 1
-        player2.games_won += 1
+        won, lost, tied = (0, 1), (1, 0), (0, 0)
 
     # Calculate rating changes
     elo_change_p1 = round(K * (score_p1 - expected_p1))
     elo_change_p2 = round(K * (score_p2 - expected_p2))
 
-    # Update ratings
-    player1.elo_rating += elo_change_p1
-    player2.elo_rating += elo_change_p2
-
-    # Update games played
-    player1.games_played += 1
-    player2.games_played += 1
+    def per_player(p1_value, p2_value):
+        return db.case({player1.id: p1_value, player2.id: p2_value}, value=User.id)
+
+    # Update both players in a single statement, incrementing in SQL so
+    # overlapping games for the same user can't overwrite each other
+    db.session.execute(
+        db.update(User)
+        .where(User.id.in_([player1.id, player2.id]))
+        .values(
+            elo_rating=User.elo_rating + per_player(elo_change_p1, elo_change_p2),
+            games_played=User.games_played + 1,
+            games_won=User.games_won + per_player(*won),
+            games_lost=User.games_lost + per_player(*lost),
+            games_tied=User.games_tied + per_player(*tied)
+        )
+        .execution_options(synchronize_session=False)
+    )
 
     # Store ELO changes in game record
     game.player1_elo_change = elo_change_p1
     game.player2_elo_change = elo_change_p2
 
-    db.session.add(player1)
-    db.session.add(player2)
-
 @socketio.on('play_again')
 def handle_play_again(data):
     """Handle play again request - creates new game with same players"""
     old_game_id = data['game_id']
-    old_game = Game.query.get(old_game_id)
+    old_game = get_game_with_players(old_game_id)
 
     if not old_game:
         return
@@ -288,25 +512,25 @@ def handle_play_again(data):
     # Leave the old game room
     leave_room(f'game_{old_game_id}')
 
+    # Read usernames from the eager-loaded players before the commit expires them
+    player1_username = old_game.player1.username
+    player2_username = old_game.player2.username
+
     # Create a new game with the same players
     new_game = Game(
         player1_id=old_game.player1_id,
         player2_id=old_game.player2_id,
-        status='active',
+        status=STATUS_ACTIVE,
         is_quickplay=old_game.is_quickplay
     )
     db.session.add(new_game)
     db.session.commit()
 
-    # Get player usernames
-    player1 = User.query.get(old_game.player1_id)
-    player2 = User.query.get(old_game.player2_id)
-
     # Notify both players to join the new game
     emit('new_game_created', {
         'game_id': new_game.id,
-        'player1_username': player1.username,
-        'player2_username': player2.username
+        'player1_username': player1_username,
+        'player2_username': player2_username
     }, room=f'game_{old_game_id}')
 
 @socketio.on('connect')
@@ -314,22 +538,17 @@ def handle_connect():
     """Handle user connection"""
     if current_user.is_authenticated:
         session_id = request.sid
-        active_users[session_id] = {
-            'user_id': current_user.id,
-            'room': None
-        }
+        track_session(session_id, current_user.id)
         print(f"User {current_user.username} connected with session {session_id}")
 
 @socketio.on('join_lobby')
 def handle_join_lobby():
     """Handle user joining the lobby"""
     if current_user.is_authenticated:
-        session_id = request.sid
         join_room('lobby')
 
         # Update user's current room
-        if session_id in active_users:
-            active_users[session_id]['room'] = 'lobby'
+        set_session_room(request.sid, 'lobby')
 
         # Broadcast updated online users list
         emit('user_joined_lobby', {
@@ -341,12 +560,10 @@ def handle_join_lobby():
 def handle_leave_lobby():
     """Handle user leaving the lobby"""
     if current_user.is_authenticated:
-        session_id = request.sid
         leave_room('lobby')
 
         # Update user's current room
-        if session_id in active_users:
-            active_users[session_id]['room'] = None
+        set_session_room(request.sid, None)
 
         # Broadcast user left
         emit('user_left_lobby', {
@@ -362,10 +579,11 @@ def handle_disconnect():
 
     session_id = request.sid
 
-    if session_id not in active_users:
+    # Stop tracking the session up front so it drops out of the lobby list
+    user_info = pop_session(session_id)
+    if user_info is None:
         return
 
-    user_info = active_users[session_id]
     user_id = user_info['user_id']
     current_room = user_info['room']
 
@@ -380,15 +598,18 @@ def handle_disconnect():
         # Cancel all timers for this game
         cancel_game_timers(game_id)
 
-        if game and game.status in ['waiting', 'active']:
+        if game and game.status in (STATUS_WAITING, STATUS_ACTIVE):
             # End the game without score changes
-            if game.status == 'active' and game.player1_choice and game.player2_choice:
+            if (game.status == STATUS_ACTIVE and game.player1_choice is not None
+                    and game.player2_choice is not None):
                 # Both players made choices but disconnected before seeing result
                 # Game already completed, don't change anything
                 pass
             else:
                 # Game in progress or waiting, cancel it
-                game.status = 'cancelled'
+                if game.status == STATUS_WAITING and game.is_quickplay:
+                    remove_quickplay_game(game)
+                game.status = STATUS_CANCELLED
                 game.completed_at = datetime.utcnow()
                 db.session.commit()
 
@@ -402,7 +623,4 @@ def handle_disconnect():
         emit('user_left_lobby', {
             'user_id': user_id,
             'username': current_user.username
-        }, room='lobby', include_self=False)
-
-    # Remove from active users
-    del active_users[session_id]
\ No newline at end of file
+        }, room='lobby', include_self=False)
\ No newline at end of file
@@ -591,6 +591,11 @@ async function joinRandomGame() {
         });
 
         console.log('Response received:', response.status);
+        if (response.status === 429) {
+            showNotification('Too many attempts, please wait a moment', 'warning');
+            return;
+        }
+
         const data = await response.json();
         console.log('Response data:', data);
 
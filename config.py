@@ -1,4 +1,5 @@
 import os
+from sqlalchemy.pool import NullPool
 
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key'
@@ -18,6 +19,30 @@ class Config:
         'pool_recycle': 300,
     }
 
+    if os.environ.get('VERCEL_ENV'):
+        # Serverless invocations are short-lived, don't hold sockets across cold starts
+        SQLALCHEMY_ENGINE_OPTIONS['poolclass'] = NullPool
+    elif DATABASE_URL:
+        # Reuse a small hot set of connections (LIFO) so idle overflow ones get closed
+        SQLALCHEMY_ENGINE_OPTIONS.update({
+            'pool_use_lifo': True,
+            'pool_size': int(os.environ.get('DB_POOL_SIZE', 10)),
+            'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 20)),
+            'pool_timeout': 10,
+        })
+
+    # Optional Redis, used for the Socket.IO message queue, caching and shared state when set
+    REDIS_URL = os.environ.get('REDIS_URL')
+
+    # Response caching, shared through Redis when available
+    CACHE_TYPE = 'RedisCache' if REDIS_URL else 'SimpleCache'
+    CACHE_REDIS_URL = REDIS_URL
+    CACHE_KEY_PREFIX = 'v1:rps:'
+    CACHE_DEFAULT_TIMEOUT = 60
+
+    # Rate limit counters, shared through Redis when available
+    RATELIMIT_STORAGE_URI = REDIS_URL or 'memory://'
+
     # Production settings
     if os.environ.get('RAILWAY_ENVIRONMENT') == 'production':
         SESSION_COOKIE_SECURE = True
@@ -0,0 +1,82 @@
+"""
+Migration script to store Game status and choices as small integers
+Run this with: python convert_game_enums.py
+"""
+
+from sqlalchemy import inspect
+from sqlalchemy.types import Integer
+
+from app import create_app
+from app.models import (
+    db, Game,
+    STATUS_WAITING, STATUS_ACTIVE, STATUS_COMPLETED, STATUS_CANCELLED,
+    CHOICE_NAMES
+)
+
+STATUS_VALUES = {
+    'waiting': STATUS_WAITING,
+    'active': STATUS_ACTIVE,
+    'completed': STATUS_COMPLETED,
+    'cancelled': STATUS_CANCELLED,
+}
+CHOICE_VALUES = {name: value for value, name in enumerate(CHOICE_NAMES)}
+
+COLUMNS = [
+    'id', 'player1_id', 'player2_id', 'player1_choice', 'player2_choice', 'winner_id',
+    'status', 'is_quickplay', 'player1_elo_change', 'player2_elo_change',
+    'created_at', 'completed_at',
+]
+
+
+def to_int(column, values):
+    """SQL expression mapping a column's old string values to their integers"""
+    whens = ' '.join(f"WHEN '{name}' THEN {value}" for name, value in values.items())
+    return f"CASE {column} {whens} END"
+
+
+app = create_app()
+
+with app.app_context():
+    try:
+        with db.engine.begin() as conn:
+            columns = {column['name']: column for column in inspect(conn).get_columns('game')}
+
+            if isinstance(columns['status']['type'], Integer):
+                print("Game status and choices are already stored as integers")
+            elif conn.dialect.name == 'postgresql':
+                conn.execute(db.text("DROP INDEX IF EXISTS ix_game_waiting_quickplay"))
+                conn.execute(db.text(f"""
+                    ALTER TABLE game
+                        ALTER COLUMN status TYPE SMALLINT USING {to_int('status', STATUS_VALUES)},
+                        ALTER COLUMN player1_choice TYPE SMALLINT USING {to_int('player1_choice', CHOICE_VALUES)},
+                        ALTER COLUMN player2_choice TYPE SMALLINT USING {to_int('player2_choice', CHOICE_VALUES)}
+                """))
+                for index in Game.__table__.indexes:
+                    index.create(conn)
+                print("Converted game status and choice columns to SMALLINT")
+            else:
+                # SQLite can't change a column's type, so rebuild the table. pysqlite
+                # doesn't open a transaction for DDL by itself, so start one explicitly
+                conn.exec_driver_sql("BEGIN")
+                conn.execute(db.text("DROP INDEX IF EXISTS ix_game_waiting_quickplay"))
+                conn.execute(db.text("ALTER TABLE game RENAME TO game_old"))
+                Game.__table__.create(conn)
+
+                select_columns = [
+                    to_int(name, STATUS_VALUES) if name == 'status'
+                    else to_int(name, CHOICE_VALUES) if name in ('player1_choice', 'player2_choice')
+                    else name
+                    for name in COLUMNS
+                ]
+                conn.execute(db.text(
+                    f"INSERT INTO game ({', '.join(COLUMNS)}) "
+                    f"SELECT {', '.join(select_columns)} FROM game_old"
+                ))
+                conn.execute(db.text("DROP TABLE game_old"))
+                print("Rebuilt game table with integer status and choice columns")
+
+        print("Migration completed successfully!")
+
+    except Exception as e:
+        print(f"Error during migration: {e}")
+        print("If you're using a fresh database, you can simply delete the database file and run init_db.py again")
@@ -1,6 +1,11 @@
+# Monkey-patch the standard library before anything else is imported so that
+# Socket.IO runs on eventlet's cooperative sockets and can upgrade to WebSocket
+import eventlet
+eventlet.monkey_patch()
+
 from app import create_app, socketio
 
 app = create_app()
 
 if __name__ == '__main__':
-    socketio.run(app, debug=True)
\ No newline at end of file
+    socketio.run(app, debug=True)
@@ -0,0 +1,15 @@
+"""
+Run the SQLite schema migrations together on one connection
+Run this with: python run_migrations.py
+"""
+import sys
+
+from app.migrations import run_all
+
+if __name__ == '__main__':
+    try:
+        run_all()
+        print("All migrations completed successfully!")
+    except Exception as e:
+        print(f"Error during migration: {e}")
+        sys.exit(1)